@@ -1,5 +1,8 @@
-import json
+import asyncio
+import math
 from time import monotonic
+
+import orjson
 from textual.app import App, ComposeResult
 from textual.containers import Container, ScrollableContainer
 from textual.reactive import reactive
@@ -7,6 +10,14 @@ from textual.screen import Screen, ModalScreen
 from textual.widgets import Button, Checkbox, Header, Footer, Input, Label, Rule, Static
 
 
+_TWO_DIGIT = [f"{i:02d}" for i in range(60)]
+
+
+def write_task_file(file_name: str, task_data: bytes) -> None:
+    with open(file_name, 'wb') as f:
+        f.write(task_data)
+
+
 class DashboardScreen(Screen):
     def compose(self) -> ComposeResult:
         """
@@ -20,6 +31,18 @@ class DashboardScreen(Screen):
         yield Footer()
 
 
+class SettingsInput(Input):
+    """
+    Input for a single entry of the app SETTINGS,
+        keeping the settings key it edits
+    """
+
+    def __init__(self, key: str, value: float):
+        super().__init__(placeholder=f"{value}", id=f'{key}-settings-value')
+        self.key = key
+        self.border_title = key
+
+
 class SettingsScreen(Screen):
     CSS_PATH = "styling/settingsscreen.tcss"
 
@@ -27,11 +50,54 @@ class SettingsScreen(Screen):
         with ScrollableContainer(id="settings-screen-container"):
             yield Label("Settings Menu")
             for key, value in self.app.SETTINGS.items():
-                yield Container(Label(f"{key}"),  Input(placeholder=f"{value}", id=f'{key}-settings-value'))
+                yield SettingsInput(key, value)
+            yield Button("Save", id="save-settings", variant="success")
+
+    def on_screen_resume(self) -> None:
+        """
+        The screen is reused between visits, show the current settings
+        """
+        for settings_input in self.query(SettingsInput):
+            settings_input.placeholder = f"{self.app.SETTINGS[settings_input.key]}"
+
+    def parse_setting(self, settings_input: SettingsInput) -> float | None:
+        """
+        Parse the value of a settings input,
+            notifying and returning None when it is not a finite, non-negative number
+        """
+        try:
+            value = float(settings_input.value)
+        except ValueError:
+            value = None
+        if value is None or not math.isfinite(value) or value < 0:
+            self.notify(f'{settings_input.key} must be a non-negative number', severity='error')
+            return None
+        return value
 
     def on_input_submitted(self, event: Input.Submitted):
-        input_id = event.input.id.split('-')[0]
-        self.app.SETTINGS[input_id] = float(event.input.value)
+        if not event.input.value or self.parse_setting(event.input) is not None:
+            self.focus_next()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """
+        Apply all filled in settings at once and return to the dashboard
+        """
+        if event.button.id != "save-settings":
+            return
+        changes = {}
+        for settings_input in self.query(SettingsInput):
+            if not settings_input.value:
+                continue
+            value = self.parse_setting(settings_input)
+            if value is None:
+                return
+            if value != self.app.SETTINGS[settings_input.key]:
+                changes[settings_input.key] = value
+        if changes:
+            self.app.SETTINGS.update(changes)
+            self.app.update_total_seconds()
+        for settings_input in self.query(SettingsInput):
+            settings_input.value = ""
         self.app.switch_mode('dashboard')
 
 
@@ -57,7 +123,7 @@ class TaskModal(ModalScreen[str]):
         yield Footer()
 
     def on_input_submitted(self, event: Input.Submitted):
-        self.app.TASK_LIST.append({'task_name':f'{event.input.value}'})
+        self.app.TASK_NAMES.append(event.input.value)
         self.dismiss(event.input.value)
 
 
@@ -95,48 +161,101 @@ class TimeDisplay(Static):
     AUTO_FOCUS = None
     display_time = reactive(0.0)
 
+    # Textual widgets carry a __dict__, so __slots__ would save nothing here;
+    # class level defaults keep these out of the instance until first written
+    end_time: float | None = None
+    _pending = 0.0
+    _flush_handle: asyncio.TimerHandle | None = None
+    _expire_handle: asyncio.TimerHandle | None = None
+    _last_sec_int: int | None = None
+    _last_rendered = ""
 
     def __init__(self):
         super().__init__()
-        self.delta_time = monotonic()
-        self.time = self.app.SETTINGS['hours'] * 3600 + \
-            self.app.SETTINGS['minutes'] * 60 + self.app.SETTINGS['seconds']
-        self.display_time = reactive(self.time)
+        self.time = self.app.total_seconds
+        self.display_time = self.time
 
     def on_mount(self) -> None:
+        # The display only changes once a second, a few ticks per second
+        # keeps it in step with the start press without redrawing at 60 Hz
         self.update_timer = self.set_interval(
-            1 / 60, self.update_time, pause=True)
+            1 / 4, self.update_time, pause=True)
         self.reset()
-        self.stop()
 
     def update_time(self) -> None:
-        current_time = monotonic()
-        self.time = self.time - (current_time - self.delta_time)
+        self.time = max(self.end_time - monotonic(), 0.0)
         self.display_time = self.time
-        if int(self.time) <= 0:
-            self.time = 0.0
-            self.app.finish_task()
-            self.stop()
-            self.display_time = self.time
-        self.delta_time = current_time
+
+    def _expire(self) -> None:
+        """
+        Called once by the expiry handle when the countdown reaches zero
+        """
+        self._expire_handle = None
+        self.end_time = None
+        self.stop()
+        self.time = 0.0
+        self.display_time = self.time
+        self.app.finish_task()
 
     def watch_display_time(self) -> None:
-        mins, secs = divmod(self.time, 60)
-        hrs, mins = divmod(mins, 60)
-        self.update(f"{hrs:02.0f}:{mins:02.0f}:{secs:02.0f}")
+        # Render at once, writes arriving within 50 ms of a redraw are held
+        # back and rendered when that window closes, capping redraws at 20/s
+        self._pending = self.time
+        if self._flush_handle is None:
+            self._flush()
+            self._flush_handle = asyncio.get_running_loop().call_later(0.05, self._close_window)
+
+    def _close_window(self) -> None:
+        self._flush_handle = None
+        self._flush()
+
+    def on_unmount(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._expire_handle is not None:
+            self._expire_handle.cancel()
+            self._expire_handle = None
+
+    def _flush(self) -> None:
+        # Round up so the countdown reads 00:00:00 only once it has expired
+        current_time = math.ceil(self._pending)
+        if current_time == self._last_sec_int:
+            return
+        self._last_sec_int = current_time
+        hrs, rem = divmod(current_time, 3600)
+        mins, secs = divmod(rem, 60)
+        rendered = f"{hrs:02d}:{_TWO_DIGIT[mins]}:{_TWO_DIGIT[secs]}"
+        if rendered == self._last_rendered:
+            return
+        self._last_rendered = rendered
+        self.update(rendered)
 
     def start(self) -> None:
-        self.time = self.app.SETTINGS['hours'] * 3600 + \
-            self.app.SETTINGS['minutes'] * 60 + self.app.SETTINGS['seconds']
-        self.delta_time = monotonic()
+        """
+        Start a new countdown, or resume the current one after a stop
+        """
+        if self.end_time is None:
+            self.time = self.app.total_seconds
+        self.end_time = monotonic() + self.time
+        if self._expire_handle is not None:
+            self._expire_handle.cancel()
+        # A zero length countdown still expires, on the next loop iteration
+        self._expire_handle = asyncio.get_running_loop().call_later(self.time, self._expire)
         self.update_timer.resume()
 
     def stop(self) -> None:
         self.update_timer.pause()
+        if self._expire_handle is not None:
+            self._expire_handle.cancel()
+            self._expire_handle = None
+        if self.end_time is not None:
+            self.time = max(self.end_time - monotonic(), 0.0)
 
     def reset(self) -> None:
-        self.time = self.app.SETTINGS['hours'] * 3600 + \
-            self.app.SETTINGS['minutes'] * 60 + self.app.SETTINGS['seconds']
+        self.stop()
+        self.end_time = None
+        self.time = self.app.total_seconds
         self.display_time = self.time
 
 
@@ -165,17 +284,32 @@ class TUIMato(App):
     }
 
     SETTINGS = {'hours': 0.0, 'minutes': 25.0, 'seconds': 0.0}
-    TASK_LIST = []
 
     def on_mount(self) -> None:
+        # Task names are kept as typed, a checkbox label parses markup
+        self.TASK_NAMES: list[str] = []
+        self._tasks: list[Checkbox] = []
+        self.update_total_seconds()
         self.switch_mode("dashboard")
+
+    def update_total_seconds(self) -> None:
+        """
+        Recompute the timer length, to be called whenever SETTINGS changes
+        """
+        self.total_seconds = self.SETTINGS['hours'] * 3600 + \
+            self.SETTINGS['minutes'] * 60 + self.SETTINGS['seconds']
     
-    def action_export_task(self) -> None:
+    async def action_export_task(self) -> None:
+        # Serialise on the event loop so the snapshot is consistent,
+        # the file write itself is handed to a worker thread
+        task_data = orjson.dumps([
+            {'task_name': task_name, 'done': task.value}
+            for task_name, task in zip(self.TASK_NAMES, self._tasks)
+        ])
         try:
-            with open('pomodoro_task_list', 'w') as f:
-                f.write(json.dumps(self.TASK_LIST))
-                self.notify('Succesfully exported the tasks!', severity='information')
-        except:
+            await asyncio.to_thread(write_task_file, 'pomodoro_task_list', task_data)
+            self.notify('Succesfully exported the tasks!', severity='information')
+        except OSError:
             self.notify('Something went wrong', severity='error')
 
     def action_add_task(self) -> None:
@@ -187,31 +321,25 @@ class TUIMato(App):
             """
             Called when TaskModal is dismissed
             """
-            self.query_one("#task_container").mount(
-                Checkbox(task_name, id=f"task-{len(self.TASK_LIST)}"))
+            task = Checkbox(task_name)
+            self._tasks.append(task)
+            self.query_one("#task_container").mount(task)
         self.switch_mode("dashboard")
         self.push_screen(TaskModal(), obtain_task_input)
 
     def action_remove_task(self) -> None:
-        tasks = self.query(f"#task-{len(self.TASK_LIST)}")
-        if tasks:
-            tasks.last().remove()
-            self.TASK_LIST.pop()
+        if self._tasks:
+            self._tasks.pop().remove()
+            self.TASK_NAMES.pop()
 
     def action_finish_task(self) -> None:
         self.finish_task()
 
     def finish_task(self) -> None:
-        try:
-            for task_number in range(1, len(self.TASK_LIST) + 1): 
-                task = self.query_one(f"#task-{task_number}")
-                if task.value ==  True:
-                    continue
-                else:
-                    task.value = True
-                    break
-        except:
-            pass
+        task = next((task for task in self._tasks if not task.value), None)
+        if task is not None:
+            with self.batch_update():
+                task.value = True
 
 if __name__ == "__main__":
     app = TUIMato()
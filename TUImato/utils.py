@@ -1,15 +1,25 @@
-import tomlkit
-import os 
+import copy
+import mmap
+import os
+import tomllib
+
+_CONFIG_CACHE: dict[tuple[str, int], dict] = {}
+
 
 def load_config(file_name: str) -> dict:
     try:
         if not os.path.exists(file_name):
             return {}
+        cache_key = (file_name, os.stat(file_name).st_mtime_ns)
+        if cache_key in _CONFIG_CACHE:
+            return copy.deepcopy(_CONFIG_CACHE[cache_key])
         with open(file_name, "rb") as config_file:
-            configuration = tomli.load(config_file)
-        return configuration
-    except (FileNotFoundError, PermissionError, tomli.TOMLDecodeError):
+            if os.fstat(config_file.fileno()).st_size == 0:
+                configuration = {}
+            else:
+                with mmap.mmap(config_file.fileno(), 0, access=mmap.ACCESS_READ) as config_map:
+                    configuration = tomllib.loads(config_map[:].decode("utf-8"))
+        _CONFIG_CACHE[cache_key] = configuration
+        return copy.deepcopy(configuration)
+    except (OSError, UnicodeDecodeError, tomllib.TOMLDecodeError):
         return {}
-
-
-def write_config()
@@ -0,0 +1,43 @@
+import asyncio
+
+from TUImato.tuimato import TUIMato, TimeDisplay
+
+
+def run_countdown(settings: dict, resume_at_zero: bool = False) -> dict:
+    """
+    Start a countdown with one task in the list,
+        returning the timer state shortly afterwards
+    """
+    async def run() -> dict:
+        app = TUIMato()
+        app.SETTINGS = settings
+        async with app.run_test() as pilot:
+            await pilot.press("a")
+            await pilot.pause()
+            await pilot.press("t", "enter")
+            await pilot.pause()
+            time_display = app.screen.query_one(TimeDisplay)
+            time_display.start()
+            if resume_at_zero:
+                # Stopped once end_time has passed but before the expiry ran
+                time_display.end_time -= time_display.time
+                time_display.stop()
+                time_display.start()
+            await pilot.pause(0.3)
+            return {
+                'end_time': time_display.end_time,
+                'display': str(time_display.renderable),
+                'finished': [task.value for task in app._tasks],
+            }
+
+    return asyncio.run(run())
+
+
+def test_zero_length_countdown_finishes_task():
+    state = run_countdown({'hours': 0.0, 'minutes': 0.0, 'seconds': 0.0})
+    assert state == {'end_time': None, 'display': "00:00:00", 'finished': [True]}
+
+
+def test_resume_with_nothing_left_finishes_task():
+    state = run_countdown({'hours': 0.0, 'minutes': 0.0, 'seconds': 60.0}, resume_at_zero=True)
+    assert state == {'end_time': None, 'display': "00:00:00", 'finished': [True]}